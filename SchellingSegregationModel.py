@@ -34,7 +34,8 @@ SchellingAgent           : The ancestor agent class for all Schelling agents.
 ContinuousSchellingAgent : The ancestor agent class for Schelling agents with continuous variables.
                            Inherits from Schelling Agent.
 Neighborhood             : The class containing the methods and attributes for the agent neighborhood.
-EmptyLot                 : A null object agent that represents an empty lot in the neighborhood.
+                           Empty lots are plain EMPTY_CODE cells in the type grid (None in lots),
+                           not objects.
 
 Example:
 
@@ -50,22 +51,154 @@ The model moves from a time tick of 0 with .26 unhappiness and .52 neighborhood
 
 '''
 
-from random import sample
-from random import uniform
-from random import seed
-from random import triangular
-from random import normalvariate
-from math   import floor
-import unittest
-import csv
-import timeit
+from random import shuffle
+
+import numpy as np
+
+#numba is optional - when it is present the neighborhood scan runs as a
+#compiled parallel kernel, otherwise the numpy rolling-window pass is used
+try:
+    from numba import njit,prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 
 EMPTYLOT = '-'
+#integer code used for empty lots in the type code grid
+EMPTY_CODE = -1
+
+#agent kind codes used by the vectorized unhappiness scan
+#agents that never want to move (the ancestor class and empty lots) are NEVER_UNHAPPY
+KIND_NEVER_UNHAPPY = 0
+KIND_LIKES_SAME    = 1
+KIND_LIKES_OTHERS  = 2
 
 X_COORDINATE = 0
 Y_COORDINATE = 1
 
+"""
+Function: boxSum
+
+Window sums over a halo-padded plane using a summed-area table.
+The box kernel is separable, so two cumulative sums give every
+(2*radius+1) square window in O(cells) regardless of the radius.
+
+Arguments:
+paddedplane    2D plane padded with a torus halo of width halowidth
+halowidth      width of the halo on each side
+radius         window reach; the window includes the center cell
+
+Return:
+numpy array    window sum for every unpadded cell
+"""
+def boxSum(paddedplane,halowidth,radius):
+    dimension = paddedplane.shape[0] - 2 * halowidth
+    window = 2 * radius + 1
+    table = np.zeros((paddedplane.shape[0] + 1,paddedplane.shape[1] + 1),dtype=np.int32)
+    table[1:,1:] = np.cumsum(np.cumsum(paddedplane,axis=0,dtype=np.int32),axis=1)
+    start = halowidth - radius
+    stop  = start + window
+    return (table[stop:stop + dimension,stop:stop + dimension]
+          - table[start:start + dimension,stop:stop + dimension]
+          - table[stop:stop + dimension,start:start + dimension]
+          + table[start:start + dimension,start:start + dimension])
+
+"""
+Function: popCount3x3
+
+3x3 window sums over a halo-padded boolean mask by bit packing.
+Each cell's nine window bits are packed into one uint16 lane with
+shifted ORs and counted with a hardware popcount, so the count moves
+one bit per neighbor through memory instead of one byte.
+
+Only built for the radius 1 window - the common case - and only when
+numpy offers bitwise_count (numpy >= 2); callers fall back to <boxSum>
+otherwise.
+
+Arguments:
+paddedmask     2D boolean mask padded with a torus halo of width halowidth
+halowidth      width of the halo on each side
+
+Return:
+numpy array    window sum (center included) for every unpadded cell
+"""
+def popCount3x3(paddedmask,halowidth):
+    dimension = paddedmask.shape[0] - 2 * halowidth
+    packed = np.zeros((dimension,dimension),dtype=np.uint16)
+    bit = 0
+    for dx in (-1,0,1):
+        rows = slice(halowidth + dx,halowidth + dx + dimension)
+        for dy in (-1,0,1):
+            cols = slice(halowidth + dy,halowidth + dy + dimension)
+            packed |= paddedmask[rows,cols].astype(np.uint16) << bit
+            bit += 1
+    return np.bitwise_count(packed).astype(np.int32)
+
+if NUMBA_AVAILABLE:
+    """
+    Function: scanKernel
+
+    Compiled heart of <Neighborhood.scanNeighborhood>. Rows are handed out to
+    threads in parallel, which also acts as the cache tiling - each thread
+    works a band of rows whose neighbor windows stay resident in L1/L2.
+    The window walk itself is a direct loop; the per-agent similarity ranges
+    make the count depend on the center cell, so a shared running-sum
+    cannot be hoisted across cells.
+
+    The grid arrives padded with a torus halo of width halowidth, so the
+    stencil reads are plain offsets with no wrapping arithmetic or branches
+    in the inner loop, and similarity is one load from the precomputed code
+    compatibility table instead of float range compares. The per-lot arrays
+    are unpadded; same, total and unhappy are output arrays filled in place.
+    The neighborhood-wide reductions the stats need are accumulated in the
+    same sweep and returned, so no separate summing pass is required.
+
+    Return:
+    Tuple  (sum of same counts, sum of total counts, number of unhappy agents)
+    """
+    @njit(parallel=True,nogil=True,cache=True)
+    def scanKernel(paddedgrid,compat,halowidth,prefgrid,kindgrid,radgrid,same,total,unhappy):
+        dimension = prefgrid.shape[0]
+        samesum      = 0
+        totalsum     = 0
+        unhappycount = 0
+        for x in prange(dimension):
+            for y in range(dimension):
+                centercode = paddedgrid[x + halowidth,y + halowidth]
+                if centercode == EMPTY_CODE:
+                    same[x,y]  = 0
+                    total[x,y] = 0
+                    unhappy[x,y] = False
+                    continue
+                radius = radgrid[x,y]
+                samecount  = 0
+                totalcount = 0
+                for dx in range(-radius,radius + 1):
+                    for dy in range(-radius,radius + 1):
+                        if dx == 0 and dy == 0: continue
+                        nx = x + halowidth + dx
+                        ny = y + halowidth + dy
+                        neighborcode = paddedgrid[nx,ny]
+                        if neighborcode == EMPTY_CODE: continue
+                        totalcount += 1
+                        if compat[centercode,neighborcode]: samecount += 1
+                same[x,y]  = samecount
+                total[x,y] = totalcount
+                samesum  += samecount
+                totalsum += totalcount
+                if totalcount == 0:
+                    unhappy[x,y] = False
+                elif kindgrid[x,y] == KIND_LIKES_SAME:
+                    #cross-multiplied compare - no division in the inner loop
+                    unhappy[x,y] = samecount < prefgrid[x,y] * totalcount
+                elif kindgrid[x,y] == KIND_LIKES_OTHERS:
+                    unhappy[x,y] = totalcount - samecount < prefgrid[x,y] * totalcount
+                else:
+                    unhappy[x,y] = False
+                if unhappy[x,y]: unhappycount += 1
+        return (samesum,totalsum,unhappycount)
+
 """
 SchellingAgent
 
@@ -73,6 +206,13 @@ Ancestor Class for all the Schelling Agents in the module. ScheliingAgent is mea
 an ancestor class, it should not be instantiated directly.
 """
 class SchellingAgent(object):
+    #no per-instance __dict__ - thousands of agents per neighborhood make
+    #the fixed slot layout worth it in memory and attribute lookups
+    __slots__ = ('neighborhood','mytype','preference','neighborRadius',
+                 'agentindex','typecode','_x','_y')
+    #tells the vectorized scan how this agent judges its neighbors
+    #subclasses with their own idea of happiness override this
+    agentKind = KIND_NEVER_UNHAPPY
     """
     method: __init__
 
@@ -87,13 +227,28 @@ class SchellingAgent(object):
                           A radius of one implies 8 neighbors
     """
     def __init__(self,neighborhood,mytype,percentpreference = 0.0,coordinates=None,viewRadius = 1):
-        
+
         self.neighborhood   = neighborhood
         self.mytype         = mytype
         self.preference     = percentpreference
         self.neighborRadius= viewRadius
+        self.agentindex     = None
+        minrange,maxrange = self.typeRange()
+        self.typecode = neighborhood.internType(mytype,minrange,maxrange)
         self.setCoordinates(coordinates)
     """
+    method: typeRange
+
+    The similarity range to intern this agent's type code with.
+    None values mean the agent matches neighbors of exactly its own type;
+    <ContinuousSchellingAgent> overrides this with its min/max range.
+
+    Return:
+    Tuple   (minrange,maxrange) or (None,None) for an exact match
+    """
+    def typeRange(self):
+        return (None,None)
+    """
     method: setCoordinates
 
     logic to deal with setting coordinates of the agent - absense of coordinates implies
@@ -102,14 +257,42 @@ class SchellingAgent(object):
     Arguments:
     coordinates              coordinates to use to position the agent
     """
-    def setCoordinates(self,coordinates):        
-        if coordinates != None:
+    def setCoordinates(self,coordinates):
+        if coordinates is not None:
             self.x = coordinates[X_COORDINATE]
             self.y = coordinates[Y_COORDINATE]
             self.neighborhood.putAgent(self)
         else:
             self.x              = 0
-            self.y              = 0     
+            self.y              = 0
+
+    """
+    property: x / y
+
+    Registered agents keep their coordinates in the neighborhood's
+    structure-of-arrays store so batch operations can read every agent's
+    position without touching the objects; agents that have not been
+    placed yet fall back to plain attributes.
+    """
+    @property
+    def x(self):
+        if self.agentindex is None: return self._x
+        return int(self.neighborhood.agentxs[self.agentindex])
+
+    @x.setter
+    def x(self,value):
+        if self.agentindex is None: self._x = value
+        else: self.neighborhood.agentxs[self.agentindex] = value
+
+    @property
+    def y(self):
+        if self.agentindex is None: return self._y
+        return int(self.neighborhood.agentys[self.agentindex])
+
+    @y.setter
+    def y(self,value):
+        if self.agentindex is None: self._y = value
+        else: self.neighborhood.agentys[self.agentindex] = value
 
     """
     method: isMyType
@@ -136,8 +319,10 @@ class SchellingAgent(object):
     List of Neighbors
     """
     def getNeighbors(self):
-        adjoining_lots = self.neighborhood.getNeighborhood(self.x,self.y,self.neighborRadius)
-        real_neighbors = [lot for row in adjoining_lots for lot in row  if lot.mytype!=EMPTYLOT and lot!=self]
+        #occupied cells come straight off the code grid - empty lots are
+        #never materialized just to be filtered back out
+        lots = self.neighborhood.getNeighborAgents(self.x,self.y,self.neighborRadius)
+        real_neighbors = [lot for lot in lots if lot is not self]
         return real_neighbors
 
     """
@@ -151,22 +336,49 @@ class SchellingAgent(object):
     List of neighbors that are like me
     """
     def getSameNeighbors(self,neighbors = None):
-        if neighbors ==None: neighbors = self.getNeighbors()
-        same_neighbors = [neighbor  for neighbor in neighbors if self.isMyType(neighbor)==True]
+        if neighbors is None: neighbors = self.getNeighbors()
+        #one compat table load per neighbor instead of a method dispatch -
+        #the table already encodes every code pair's isMyType answer
+        compat = self.neighborhood.compatTable()
+        mycode = self.typecode
+        same_neighbors = [neighbor  for neighbor in neighbors if compat[mycode,neighbor.typecode]]
         return same_neighbors
     """
+    method: countSameInWindow
+
+    Count the cells in a window of type codes that are 'like' me.
+    Works for discrete and continuous agents alike - the neighborhood's
+    compatibility table already encodes each code pair's answer, so the
+    count is one table gather instead of per-neighbor comparisons.
+
+    Arguments:
+    codes              a 2D numpy array of type codes cut from the neighborhood grid
+    Return:
+    int                number of cells in the window with my type
+    """
+    def countSameInWindow(self,codes):
+        occupied = codes[codes != EMPTY_CODE]
+        return int(self.neighborhood.compatTable()[self.typecode,occupied].sum())
+    """
     method: countNeighbors
 
-    A convenience method to return the total number of neighbors and the neighbors that are the same
+    A convenience method to return the total number of neighbors and the neighbors that are the same.
+    Counts are taken from the type code grid rather than lists of agent objects,
+    so no neighbor lists are built on the hot path.
 
     Return:
     Tuple  Position 0 = Count of Same Neighbors
            Position 1 = Count of All Neighbors
     """
     def countNeighbors(self):
-        neighbors     = self.getNeighbors()
-        sameNeighbors = self.getSameNeighbors(neighbors)
-        return (len(sameNeighbors),len(neighbors))
+        codes = self.neighborhood.getNeighborhoodCodes(self.x,self.y,self.neighborRadius)
+        total = int((codes != EMPTY_CODE).sum())
+        same  = self.countSameInWindow(codes)
+        #remove my own contribution when I actually occupy the center lot
+        if self.neighborhood.lots[self.x][self.y] is self:
+            total = total - 1
+            if self.neighborhood.compatTable()[self.typecode,self.typecode]: same = same - 1
+        return (same,total)
     """
     method: percentSame
 
@@ -174,16 +386,23 @@ class SchellingAgent(object):
 
     Return:
     float between 0 and 1.0 Percentage of like neighbors
-    """  
+    """
     def percentSame(self,neighbors = None):
-        if neighbors == None:
-            neighbors = self.getNeighbors()
-        #getNeighbors returns nothing when the agent is surrounded by empty lots
-        if len(neighbors)==0:
+        if neighbors is not None:
+            if not neighbors:
+                return 0.0
+            #count in one pass - no temporary list of the same neighbors,
+            #and the compat table stands in for per-neighbor dispatch
+            compat = self.neighborhood.compatTable()
+            mycode = self.typecode
+            numbersame = sum(1 for neighbor in neighbors if compat[mycode,neighbor.typecode])
+            return numbersame / (len(neighbors) * 1.0)
+        same,total = self.countNeighbors()
+        #an agent surrounded by empty lots has no neighbors to compare with
+        if total==0:
             return 0.0
-        numbersame = len(self.getSameNeighbors(neighbors))
-        percent = numbersame / (len(neighbors) * 1.0)
-        return percent        
+        percent = same / (total * 1.0)
+        return percent
 
     """
     method: isUnhappy
@@ -209,42 +428,15 @@ class SchellingAgent(object):
     def __repr__(self):
         return repr(self.mytype)
 
-"""
-EmptyLot
-
-An empty lot is treated as a pseudo-agent.
-The idea is to have the empty lot be use a null object pattern.
-
-"""
-class EmptyLot(SchellingAgent):
-    """
-    method: __init__
-
-    Overrides coordinate setup, already exists as part of the landscape
-    
-    """
-    def __init__(self,myneighborhood,coords):
-        super(EmptyLot,self).__init__(neighborhood=myneighborhood,mytype=EMPTYLOT)
-        self.x = coords[X_COORDINATE]
-        self.y = coords[Y_COORDINATE]
-    """
-    method: info
-
-    provides a nice source of debugging info about the agent
-
-    Return:
-    String   A string with important information about the current state of the agent.
-    """
-    def info(self):
-        return 'Empty lot at %s,%s.'%(self.x,self.y)
-
 """
 LikesSameAgent
 
 A discrete Schelling Agent that likes to have a percentage of the neighbors be of the same type as the agent.
 
 """     
-class LikesSameAgent(SchellingAgent):   
+class LikesSameAgent(SchellingAgent):
+    __slots__ = ()
+    agentKind = KIND_LIKES_SAME
     """
     method: isUnhappy
 
@@ -254,10 +446,10 @@ class LikesSameAgent(SchellingAgent):
     Boolean  True - agent is unhappy with the neighborhood  False - agent is content    
     """
     def isUnhappy(self):
-        neighbors = self.getNeighbors()
-        if neighbors==[]: return False
-        likeme = self.percentSame(neighbors)
-        if likeme < self.preference:
+        same,total = self.countNeighbors()
+        if total==0: return False
+        #cross-multiplied - same/total < preference without the division
+        if same < self.preference * total:
             return True
         return False
     """
@@ -267,7 +459,7 @@ class LikesSameAgent(SchellingAgent):
 
     Return:
     String   A string with important information about the current state of the agent.
-    """        
+    """
     def info(self):
         return 'Likes Same Agent Type %s Preference %s at %s,%s.'%(self.mytype,self.preference,self.x,self.y)
 
@@ -278,6 +470,8 @@ A discrete Schelling Agent that likes to have a percentage of the neighbors be o
 
 """  
 class LikesOthersAgent(SchellingAgent):
+    __slots__ = ()
+    agentKind = KIND_LIKES_OTHERS
     """
     method: isUnhappy
 
@@ -287,10 +481,10 @@ class LikesOthersAgent(SchellingAgent):
     Boolean  True - agent is unhappy with the neighborhood  False - agent is content    
     """
     def isUnhappy(self):
-        neighbors = self.getNeighbors()
-        if neighbors==[]: return False       
-        others_percent = 1.0 - self.percentSame(neighbors)
-        if others_percent < self.preference:
+        same,total = self.countNeighbors()
+        if total==0: return False
+        #cross-multiplied - (1 - same/total) < preference without the division
+        if total - same < self.preference * total:
             return True
         return False
     """
@@ -300,9 +494,9 @@ class LikesOthersAgent(SchellingAgent):
 
     Return:
     String   A string with important information about the current state of the agent.
-    """    
+    """
     def info(self):
-        return 'Likes Other Agent Type %s Preference %s at %s,%s.'%(self.mytype,self.preference,self.x,self.y) 
+        return 'Likes Other Agent Type %s Preference %s at %s,%s.'%(self.mytype,self.preference,self.x,self.y)
 """
 ContinuousSchellingAgent
 
@@ -311,6 +505,7 @@ This class is meant to be subclassed for use.
 
 """
 class ContinuousSchellingAgent(SchellingAgent):
+    __slots__ = ('minrange','maxrange')
     """
     method: __init__
 
@@ -320,9 +515,10 @@ class ContinuousSchellingAgent(SchellingAgent):
     maxrange     a new argument for the ContinuousSchellingAgent that defines the top of a similar agent range.
     """
     def __init__(self,neighborhood,mytype,minrange,maxrange,percentPreference = 0.0,coordinates=None,viewRadius = 1):
-        super(ContinuousSchellingAgent,self).__init__(neighborhood,mytype,percentPreference,coordinates,viewRadius)
+        #the range must exist before the ancestor places the agent on the grid
         self.minrange = minrange
         self.maxrange = maxrange
+        super(ContinuousSchellingAgent,self).__init__(neighborhood,mytype,percentPreference,coordinates,viewRadius)
     """
     method: isMyType
 
@@ -334,9 +530,19 @@ class ContinuousSchellingAgent(SchellingAgent):
     Returns:
     Boolean    True -- Agent is like me     False -- Agent is not like me
     """
-    def isMyType(self,neighbor): 
+    def isMyType(self,neighbor):
         if neighbor.mytype >= self.minrange and neighbor.mytype <= self.maxrange: return True
         return False
+    """
+    method: typeRange
+
+    The similarity range to intern this agent's type code with.
+
+    Return:
+    Tuple   (minrange,maxrange) of the inclusive similarity range
+    """
+    def typeRange(self):
+        return (self.minrange,self.maxrange)
 """
 ContinuousLikesSameAgent
 
@@ -344,6 +550,8 @@ Defines a continuous Schelling agent that prefers agents like itself.
 
 """
 class ContinuousLikesSameAgent(ContinuousSchellingAgent):
+    __slots__ = ()
+    agentKind = KIND_LIKES_SAME
     """
     method: isUnhappy
 
@@ -353,10 +561,10 @@ class ContinuousLikesSameAgent(ContinuousSchellingAgent):
     Boolean  True - agent is unhappy with the neighborhood  False - agent is content    
     """    
     def isUnhappy(self):
-        neighbors = self.getNeighbors()
-        if neighbors==[]: return False
-        likeme = self.percentSame(neighbors)
-        if likeme < self.preference:
+        same,total = self.countNeighbors()
+        if total==0: return False
+        #cross-multiplied - same/total < preference without the division
+        if same < self.preference * total:
             return True
         return False
     """
@@ -366,9 +574,9 @@ class ContinuousLikesSameAgent(ContinuousSchellingAgent):
 
     Return:
     String   A string with important information about the current state of the agent.
-    """        
+    """
     def info(self):
-        return 'Continuous Likes Same Agent  Type %s Attribute %s Minrange %s, Maxrange %s at %s,%s.'%(self.mytype,self.preference,self.minrange,self.maxrange,self.x,self.y)    
+        return 'Continuous Likes Same Agent  Type %s Attribute %s Minrange %s, Maxrange %s at %s,%s.'%(self.mytype,self.preference,self.minrange,self.maxrange,self.x,self.y)
 
 """
 ContinuousLikesOtherAgent
@@ -377,6 +585,8 @@ Defines a continuous Schelling agent that prefers agents not like itself.
 
 """    
 class ContinuousLikesOtherAgent(ContinuousSchellingAgent):
+    __slots__ = ()
+    agentKind = KIND_LIKES_OTHERS
     """
     method: isUnhappy
 
@@ -386,10 +596,10 @@ class ContinuousLikesOtherAgent(ContinuousSchellingAgent):
     Boolean  True - agent is unhappy with the neighborhood  False - agent is content    
     """    
     def isUnhappy(self):
-        neighbors = self.getNeighbors()
-        if neighbors==[]: return False       
-        others_percent = 1.0 - self.percentSame(neighbors)
-        if others_percent < self.preference:
+        same,total = self.countNeighbors()
+        if total==0: return False
+        #cross-multiplied - (1 - same/total) < preference without the division
+        if total - same < self.preference * total:
             return True
         return False
     """
@@ -399,9 +609,9 @@ class ContinuousLikesOtherAgent(ContinuousSchellingAgent):
 
     Return:
     String   A string with important information about the current state of the agent.
-    """        
+    """
     def info(self):
-        return 'Continuous Likes Other Agents  Type %s Attribute %s Minrange %s, Maxrange %s at %s,%s.'%(self.mytype,self.preference,self.minrange,self.maxrange,self.x,self.y)        
+        return 'Continuous Likes Other Agents  Type %s Attribute %s Minrange %s, Maxrange %s at %s,%s.'%(self.mytype,self.preference,self.minrange,self.maxrange,self.x,self.y)
 
 """
 Neighborhood
@@ -415,33 +625,139 @@ class Neighborhood(object):
     Define a torus neighborhood of dimension length and width
     Arguments:
     dimension           the size of one 'side' of the neighborhood
+    Arguments:
+    dimension           the size of one 'side' of the neighborhood
+    rng                 optional numpy random Generator for the move shuffles;
+                        numpy's PCG64 is faster than the stdlib Mersenne
+                        Twister, but the default of None keeps the stdlib
+                        random module so random.seed keeps working
     Object Attributes:
     self.dimension      the length and width of the neighborhood
     self.lots           the grid that stores the neighborhood
+    self.grid           a numpy int16 mirror of the grid holding one type code per lot
+                        all of the neighbor counting runs against this array
     self.agents         the list of agents in the neighborhood
     self.unhappyagents  cache for the list of unhappy agents
-    self.runOnce        indicator if moves have been performed at least once
     """
-    def __init__(self,dimension):
-        self.dimension = dimension 
-        self.lots      = [[EmptyLot(self,(x,y)) for y in range(self.dimension)] for x in range(self.dimension)]
+    def __init__(self,dimension,rng = None):
+        self.dimension = dimension
+        self.rng       = rng
+        #int16 codes - continuous agents intern one code per distinct
+        #(value,range) signature, which overruns int8 as soon as two age
+        #windows share a wide age span
+        self.grid      = np.full((dimension,dimension),EMPTY_CODE,dtype=np.int16)
+        #per-lot agent data used by the vectorized scan, kept in step with the grid
+        self.kindgrid  = np.zeros((dimension,dimension),dtype=np.int8)
+        #float64 so the scans compare against exactly the preference value
+        #the agent's own isUnhappy uses - float32 rounding moves boundary
+        #cases like 2 of 5 neighbors against a 0.4 preference
+        self.prefgrid  = np.zeros((dimension,dimension),dtype=np.float64)
+        self.radgrid   = np.zeros((dimension,dimension),dtype=np.int8)
+        #empty lots are just None here and EMPTY_CODE in the type grid -
+        #no objects are allocated for them
+        self.lots      = [[None] * dimension for x in range(self.dimension)]
+        #coordinates of the empty lots, kept current by setCellData so
+        #move never has to rescan the grid for them
+        self.empties   = {(x,y) for x in range(dimension) for y in range(dimension)}
         self.agents    = []
         self.unhappyagents = []
-        self.runOnce   = False
+        self.scansums  = (0,0,0)
+        #cached scan results plus the cells whose neighborhoods have
+        #changed since the cache was built - a swap only disturbs the
+        #windows around its two lots, so most ticks need no full rescan
+        self._scancache  = None
+        self._dirtycells = set()
+        #structure-of-arrays store for the registered agents' coordinates -
+        #the coordinate properties and the batch gathers read these, while
+        #the scan kernels take everything else from the per-lot grids
+        self.agentxs    = np.zeros(dimension * dimension,dtype=np.int32)
+        self.agentys    = np.zeros(dimension * dimension,dtype=np.int32)
+        self.typecodes = {}
+        self._codetypes  = []
+        self._codevalues = []
+        self._codelows  = []
+        self._codehighs = []
+        self._compat = np.zeros((0,0),dtype=np.bool_)
+        #wrapped coordinate lookup table - index i+dimension holds i wrapped
+        #onto the torus, valid for any offset up to a full dimension either way
+        self.wrapindex = np.arange(-dimension,2 * dimension) % dimension
+    """
+    method: internType
+
+    Assign a small integer code to an agent type signature the first time it
+    is seen. A signature is the type value plus the similarity range the
+    agent applies to its neighbors, so every code has a fixed answer to
+    'is code b like code a' and the whole relation can be precomputed
+    into the compatibility table.
+
+    Arguments:
+    mytype     the agent type value to intern
+    minrange   bottom of the agent's similarity range, None for exact match
+    maxrange   top of the agent's similarity range, None for exact match
+    Return:
+    int        the type code for this signature
+    """
+    def internType(self,mytype,minrange = None,maxrange = None):
+        key = (mytype,minrange,maxrange)
+        code = self.typecodes.get(key)
+        if code is None:
+            code = len(self.typecodes)
+            self.typecodes[key] = code
+            #keep the numeric value of the type when there is one so
+            #range checks against neighbors work from codes - anything
+            #else stays off the value axis as NaN, otherwise a label
+            #like 'X' would collide with a genuinely numeric type
+            try:
+                value = float(mytype)
+                if value != mytype:
+                    value = float('nan')
+            except (TypeError,ValueError):
+                value = float('nan')
+            self._codetypes.append(mytype)
+            self._codevalues.append(value)
+            values = np.array(self._codevalues,dtype=np.float32)
+            low  = value if minrange is None else minrange
+            high = value if maxrange is None else maxrange
+            self._codelows.append(low)
+            self._codehighs.append(high)
+            #one boolean per code pair replaces the two float compares
+            #per neighbor in the scan kernels
+            lows   = np.array(self._codelows,dtype=np.float32)
+            highs  = np.array(self._codehighs,dtype=np.float32)
+            self._compat = (values[None,:] >= lows[:,None]) & \
+                           (values[None,:] <= highs[:,None])
+            #NaN compares False against every bound, so non-numeric rows
+            #come out empty - fill them with the exact equality isMyType
+            #applies to such types
+            for row,rowtype in enumerate(self._codetypes):
+                if np.isnan(self._codevalues[row]):
+                    for col,coltype in enumerate(self._codetypes):
+                        self._compat[row][col] = rowtype == coltype
+        return code
+    """
+    method: compatTable
+
+    Return the precomputed code compatibility table.
+
+    Return:
+    numpy array   compat[a,b] is True when an agent with code a
+                  considers a neighbor with code b to be like itself
+    """
+    def compatTable(self):
+        return self._compat
     """
     method: wrap
 
-    Adjust the incoming coordinate to account for being on a torus
+    Adjust the incoming coordinate to account for being on a torus.
+    Reads the precomputed lookup table instead of branching.
 
     Argument:
     x      a coordginate to wrap around the torus
     Return:
-    int   adjusted coordinate value    
+    int   adjusted coordinate value
     """
     def wrap(self,x):
-        if x<0: return(self.dimension+x)
-        if x>self.dimension-1: return(x-self.dimension)
-        return x
+        return int(self.wrapindex[x + self.dimension])
     """
     method: getNeighborhood
 
@@ -457,9 +773,10 @@ class Neighborhood(object):
     """
     def getNeighborhood(self,x,y,radius):
         neighbors=[]
-        x_range = [self.wrap(i) for i in range(x - radius, x + radius +1)]
-        y_range = [self.wrap(i) for i in range(y - radius, y + radius +1)]
-        
+        offset  = self.dimension
+        x_range = self.wrapindex[x - radius + offset : x + radius + 1 + offset]
+        y_range = self.wrapindex[y - radius + offset : y + radius + 1 + offset]
+
         for x in x_range:
             row = []
             for y in y_range:
@@ -468,6 +785,47 @@ class Neighborhood(object):
 
         return neighbors
     """
+    method: getNeighborhoodCodes
+
+    Get the visible neighborhood at a point in the grid as a window of type codes.
+    This is the form the hot path counting code wants - a small numpy array
+    instead of nested lists of agent objects.
+
+    Arguments:
+    x       x coordinate on the neighborhood grid
+    y       y coordinate on the neighborhood grid
+    radius  number of lots around the coordinate to pull for the neighborhood
+
+    Returns:
+    numpy array    a (2*radius+1) square window of type codes
+    """
+    def getNeighborhoodCodes(self,x,y,radius):
+        offset = self.dimension
+        rows = self.wrapindex[x - radius + offset : x + radius + 1 + offset]
+        cols = self.wrapindex[y - radius + offset : y + radius + 1 + offset]
+        return self.grid[np.ix_(rows,cols)]
+    """
+    method: getNeighborAgents
+
+    Get the agents in the window around a point. Occupied cells are
+    found in the type code grid first, so only actual agents are ever
+    touched at the Python level - empty cells cost nothing.
+
+    Arguments:
+    x       x coordinate on the neighborhood grid
+    y       y coordinate on the neighborhood grid
+    radius  number of lots around the coordinate to pull for the neighborhood
+
+    Returns:
+    List    the agents in the window, including one at the center if occupied
+    """
+    def getNeighborAgents(self,x,y,radius):
+        offset = self.dimension
+        rows = self.wrapindex[x - radius + offset : x + radius + 1 + offset]
+        cols = self.wrapindex[y - radius + offset : y + radius + 1 + offset]
+        codes = self.grid[np.ix_(rows,cols)]
+        return [self.lots[rows[i]][cols[j]] for i,j in np.argwhere(codes != EMPTY_CODE)]
+    """
     method: putAgent
 
     Add an agent to the neighborhood grid
@@ -476,8 +834,182 @@ class Neighborhood(object):
     agent      agent to add to the grid
     """
     def putAgent(self,agent):
+        index = len(self.agents)
+        if index >= len(self.agentxs):
+            #more registrations than lots - grow the agent arrays
+            for name in ('agentxs','agentys'):
+                setattr(self,name,np.concatenate([getattr(self,name),getattr(self,name)]))
+        self.agentxs[index] = agent.x
+        self.agentys[index] = agent.y
+        agent.agentindex = index
         self.agents.append(agent)
         self.lots[agent.x][agent.y] = agent
+        self.setCellData(agent)
+        #registration can change the radius mix and the code table - any
+        #cached scan is stale, start fresh on the next pass
+        self._scancache = None
+        self._dirtycells.clear()
+    """
+    method: setCellData
+
+    Write an agent's type code and scan data into the per-lot arrays at
+    the agent's current coordinates.
+
+    Argument:
+    agent      agent whose grid cell should be refreshed
+    """
+    def setCellData(self,agent):
+        x,y = agent.x,agent.y
+        self.grid[x][y]     = agent.typecode
+        self.empties.discard((x,y))
+        self.kindgrid[x][y] = agent.agentKind
+        self.prefgrid[x][y] = agent.preference
+        self.radgrid[x][y]  = agent.neighborRadius
+    """
+    method: clearCell
+
+    Mark a lot as empty in the type grid and the per-lot arrays.
+
+    Arguments:
+    x       x coordinate of the lot
+    y       y coordinate of the lot
+    """
+    def clearCell(self,x,y):
+        self.grid[x][y]     = EMPTY_CODE
+        self.empties.add((x,y))
+        self.kindgrid[x][y] = KIND_NEVER_UNHAPPY
+        self.prefgrid[x][y] = 0.0
+        self.radgrid[x][y]  = 0
+    """
+    method: scanNeighborhood
+
+    Compute neighbor statistics for every lot in the neighborhood in one
+    vectorized pass instead of asking every agent to rescan its own window.
+    Windows are accumulated by rolling the occupancy and value planes over
+    each neighbor offset, so all the counting happens inside numpy.
+
+    Return:
+    Tuple  0 = array of same-type neighbor counts per lot
+           1 = array of total neighbor counts per lot
+           2 = boolean array marking the lots with unhappy agents
+    """
+    def scanNeighborhood(self):
+        if self._scancache is not None:
+            if not self._dirtycells:
+                return self._scancache
+            #a swap only changes the windows around its two lots - when few
+            #lots moved, patching those windows beats rescanning the grid
+            reach = int(self.radgrid.max()) if self.agents else 1
+            windowarea = (2 * reach + 1) ** 2
+            if len(self._dirtycells) * windowarea * 2 < self.dimension * self.dimension:
+                self.rescanCells(self._dirtycells,reach)
+                self._dirtycells = set()
+                return self._scancache
+        self._dirtycells = set()
+        occupied = self.grid != EMPTY_CODE
+        compat = self.compatTable()
+        same  = np.zeros(self.grid.shape,dtype=np.int32)
+        total = np.zeros(self.grid.shape,dtype=np.int32)
+        #pad the grid with a torus halo so every stencil read below is a
+        #plain contiguous slice - no wrapping arithmetic on the hot path
+        halowidth = int(self.radgrid.max()) if self.agents else 1
+        paddedgrid = np.pad(self.grid,halowidth,mode='wrap')
+        if NUMBA_AVAILABLE:
+            unhappy = np.zeros(self.grid.shape,dtype=np.bool_)
+            self.scansums = scanKernel(paddedgrid,compat,halowidth,
+                                       self.prefgrid,self.kindgrid,self.radgrid,same,total,unhappy)
+            self._scancache = (same,total,unhappy)
+            return self._scancache
+        dimension = self.dimension
+        paddedoccupied = paddedgrid != EMPTY_CODE
+        #agents may use different view radii - scan once per radius in use
+        for radius in np.unique(self.radgrid[occupied]):
+            cells = occupied & (self.radgrid == radius)
+            #radius 1 windows fit in one popcount lane per cell - use the
+            #bit-packed counter there and the summed-area table elsewhere
+            if radius == 1 and hasattr(np,'bitwise_count'):
+                windowsum = lambda mask: popCount3x3(mask,halowidth)
+            else:
+                windowsum = lambda mask: boxSum(mask,halowidth,radius)
+            #the occupancy count is the same box filter for every agent,
+            #so running sums give it in one pass whatever the radius
+            radiustotal = windowsum(paddedoccupied) - occupied
+            #same counts come from per-code box sums combined through the
+            #compatibility table - each code's count is the sum of the box
+            #counts of the codes it considers like itself
+            radiussame = np.zeros(self.grid.shape,dtype=np.int32)
+            presentcodes = np.unique(self.grid[occupied])
+            codeboxes = {int(code):windowsum(paddedgrid == code) for code in presentcodes}
+            for code in np.unique(self.grid[cells]):
+                codecells = cells & (self.grid == code)
+                for other in presentcodes:
+                    if compat[code,other]:
+                        radiussame[codecells] += codeboxes[int(other)][codecells]
+                #my own lot sits in the middle of my window - take it back out
+                if compat[code,code]: radiussame[codecells] -= 1
+            same[cells]  = radiussame[cells]
+            total[cells] = radiustotal[cells]
+        #cross-multiplied compares keep this in integer counts - no
+        #elementwise division pass is needed
+        threshold = self.prefgrid * total
+        unhappy = occupied & (total > 0) & (((self.kindgrid == KIND_LIKES_SAME) & (same < threshold)) |
+                                            ((self.kindgrid == KIND_LIKES_OTHERS) & (total - same < threshold)))
+        self.scansums = (int(same.sum()),int(total.sum()),int(unhappy.sum()))
+        self._scancache = (same,total,unhappy)
+        return self._scancache
+    """
+    method: rescanCells
+
+    Patch the cached scan arrays after a handful of lots changed hands.
+    Every lot whose window can see a changed lot gets its counts redone
+    from the current grid, and the running sums are adjusted by the
+    difference so scansums stays exact.
+
+    Arguments:
+    dirtycells   coordinates of the lots whose contents changed
+    reach        largest view radius in play, bounds the disturbed area
+    """
+    def rescanCells(self,dirtycells,reach):
+        same,total,unhappy = self._scancache
+        samesum,totalsum,unhappycount = self.scansums
+        dimension = self.dimension
+        #collect every lot close enough for its window to cover a change
+        affected = set()
+        for x,y in dirtycells:
+            for dx in range(-reach,reach + 1):
+                nx = int(self.wrapindex[x + dx + dimension])
+                for dy in range(-reach,reach + 1):
+                    affected.add((nx,int(self.wrapindex[y + dy + dimension])))
+        halowidth = int(self.radgrid.max()) if self.agents else 1
+        paddedgrid = np.pad(self.grid,halowidth,mode='wrap')
+        compat = self.compatTable()
+        for x,y in affected:
+            code = int(self.grid[x][y])
+            if code == EMPTY_CODE:
+                newsame,newtotal,newunhappy = 0,0,False
+            else:
+                radius = int(self.radgrid[x][y])
+                window = paddedgrid[x + halowidth - radius : x + halowidth + radius + 1,
+                                    y + halowidth - radius : y + halowidth + radius + 1]
+                occupants = window[window != EMPTY_CODE]
+                newtotal = len(occupants) - 1
+                newsame  = int(compat[code,occupants].sum())
+                #my own lot sits in the middle of my window - take it back out
+                if compat[code,code]: newsame -= 1
+                kind = int(self.kindgrid[x][y])
+                if newtotal == 0 or kind == KIND_NEVER_UNHAPPY:
+                    newunhappy = False
+                elif kind == KIND_LIKES_SAME:
+                    newunhappy = newsame < float(self.prefgrid[x][y]) * newtotal
+                else:
+                    newunhappy = newtotal - newsame < float(self.prefgrid[x][y]) * newtotal
+            samesum      += newsame - int(same[x][y])
+            totalsum     += newtotal - int(total[x][y])
+            unhappycount += int(newunhappy) - int(unhappy[x][y])
+            same[x][y]    = newsame
+            total[x][y]   = newtotal
+            unhappy[x][y] = newunhappy
+        self.scansums = (samesum,totalsum,unhappycount)
     """
     method: getUnhappyAgents
 
@@ -487,22 +1019,39 @@ class Neighborhood(object):
     List   a list of unhappy agents
     """
     def getUnhappyAgents(self):
-        self.unhappyagents = [agent for agent in self.agents if agent.isUnhappy() == True]
+        same,total,unhappy = self.scanNeighborhood()
+        self.unhappyagents = self.selectAgents(unhappy)
         return self.unhappyagents
     """
+    method: selectAgents
+
+    Pick out the agents whose lots are flagged in a boolean grid mask.
+    The lookup runs over the structure-of-arrays coordinates in one
+    vectorized gather instead of asking every agent for its position.
+
+    Argument:
+    mask       boolean array over the grid
+    Return:
+    List       the agents sitting on flagged lots, in registration order
+    """
+    def selectAgents(self,mask):
+        count = len(self.agents)
+        flagged = mask[self.agentxs[:count],self.agentys[:count]]
+        return [self.agents[i] for i in np.flatnonzero(flagged)]
+    """
     method: percentUnhappy
 
-    Returns a measurement of total neighborhood unhappiness. Uses a cached list of unhappy agents if available.
+    Returns a measurement of total neighborhood unhappiness. The scan
+    cache makes repeat calls within a tick free, so no staleness flag is
+    needed - the count always reflects the current grid.
 
     Return:
     float   a representation of neighborhood unhappiness 0.0 - 1.0
     """
     def percentUnhappy(self):
-        if self.runOnce:
-           totalUnhappy = len(self.unhappyagents)
-        else:
-           totalUnhappy = len(self.getUnhappyAgents())
-        return totalUnhappy / (len(self.agents) *1.0)
+        self.scanNeighborhood()
+        samesum,totalsum,unhappycount = self.scansums
+        return unhappycount / (len(self.agents) *1.0)
     """
     method: percentSimilar
 
@@ -512,72 +1061,131 @@ class Neighborhood(object):
     float  a representation of agent neighborhood similarity 0.0-1.0
     """
     def percentSimilar(self):
-        neighborData = [ agent.countNeighbors() for agent in self.agents]
-        similar_neighbors = sum([x[0] for x in neighborData]) 
-        total_neighbors   = sum([x[1] for x in neighborData])
-        return similar_neighbors / (total_neighbors *1.0)
+        self.scanNeighborhood()
+        samesum,totalsum,unhappycount = self.scansums
+        return samesum / (totalsum *1.0)
     """
     method: getStats
 
-    A convenience method to get the stats for the neighborhood
+    A convenience method to get the stats for the neighborhood.
+    Both stats come out of one scanNeighborhood pass - the same/total
+    counts that decide unhappiness are the ones similarity is built from,
+    so there is no reason to walk the neighborhood twice.
 
     Return:
     tuple  0 = percent of unahppy agents   1 = agent neighborhood similarity
     """
     def getStats(self):
+        same,total,unhappy = self.scanNeighborhood()
+        self.unhappyagents = self.selectAgents(unhappy)
+        samesum,totalsum,unhappycount = self.scansums
         #rounded to 4 places for easy readability
         #2 places is too few to see some results
-        percent_unhappy   = round(self.percentUnhappy(),4)
-        percent_similar   = round(self.percentSimilar(),4)
+        percent_unhappy   = round(unhappycount / (len(self.agents) *1.0),4)
+        percent_similar   = round(samesum / (totalsum *1.0),4)
         return (percent_unhappy,percent_similar)
     """
+    method: tick
+
+    Advance the neighborhood one time step: one scan supplies the stats
+    and the list of movers, then the move itself runs against that list,
+    so a step costs a single pass over the grid instead of one pass for
+    the stats and another to find the unhappy agents.
+
+    Return:
+    tuple  0 = percent of unhappy agents   1 = agent neighborhood similarity
+           (the stats as they stood before the move, like getStats)
+    """
+    def tick(self):
+        stats = self.getStats()
+        #at equilibrium there is nobody to move - shuffling the empty
+        #lots among themselves would only churn the grid data and rng
+        if self.unhappyagents:
+            self.move(self.unhappyagents)
+        return stats
+    """
     method: move
 
-    Get the unhappy agents and empty lots and start moving agents around.   
+    Get the unhappy agents and empty lots and start moving agents around.
+
+    Arguments:
+    unhappy_agents   optional precomputed list of movers; when omitted the
+                     neighborhood is scanned for them
     """
-    def move(self):
-        #build the list of moveable parts
-        unhappy_agents = self.getUnhappyAgents()
-        empty_lots     = [lot for row in self.lots for lot in row if lot.mytype == EMPTYLOT]
+    def move(self,unhappy_agents = None):
+        #build the list of moveable parts - empty lots enter the pool as
+        #their bare coordinates, there are no objects behind them
+        if unhappy_agents is None:
+            unhappy_agents = self.getUnhappyAgents()
         places_to_move = []
         places_to_move.extend(unhappy_agents)
-        places_to_move.extend(empty_lots)
-        #start swapping two by two at random
-        while (len(places_to_move)>=2):
-            movers = sample(places_to_move,2)
-            places_to_move.remove(movers[0])
-            places_to_move.remove(movers[1])
-            self.swap(movers[0],movers[1])
+        places_to_move.extend(self.empties)
+        #one shuffle gives the same random pairing as drawing two at a time,
+        #without the linear remove() scans that made this loop quadratic
+        if self.rng is not None:
+            order = self.rng.permutation(len(places_to_move))
+            for i in range(0,len(places_to_move) - 1,2):
+                self.swap(places_to_move[order[i]],places_to_move[order[i + 1]])
+        else:
+            shuffle(places_to_move)
+            for i in range(0,len(places_to_move) - 1,2):
+                self.swap(places_to_move[i],places_to_move[i + 1])
     """
     method: swap
 
-    Swap the positions of two agents in the grid.
+    Swap the contents of two lots in the grid. Either item may be an
+    agent or the bare (x,y) coordinates of an empty lot.
+
+    Arguments:
+    item1      an agent or empty lot coordinates to move
+    item2      another agent or empty lot coordinates to move
+    """
+    def swap(self,item1,item2):
+        x1,y1 = item1 if type(item1) is tuple else (item1.x,item1.y)
+        x2,y2 = item2 if type(item2) is tuple else (item2.x,item2.y)
+        self.placeItem(item1,x2,y2)
+        self.placeItem(item2,x1,y1)
+        if self._scancache is not None:
+            self._dirtycells.add((x1,y1))
+            self._dirtycells.add((x2,y2))
+    """
+    method: placeItem
+
+    Put an agent - or emptiness - onto a lot and refresh the grids.
 
     Arguments:
-    agent1      an agent to move
-    agent2      another agent to move
-    """
-    def swap(self,agent1,agent2):
-        x1,y1 = agent1.x,agent1.y
-        agent1.x = agent2.x
-        agent1.y = agent2.y
-        agent2.x = x1
-        agent2.y = y1
-        self.lots[agent1.x][agent1.y] = agent1
-        self.lots[agent2.x][agent2.y] = agent2
+    item       an agent, or the former coordinates of an empty lot
+    x          x coordinate of the destination lot
+    y          y coordinate of the destination lot
+    """
+    def placeItem(self,item,x,y):
+        if type(item) is tuple:
+            self.lots[x][y] = None
+            self.clearCell(x,y)
+        else:
+            item.x = x
+            item.y = y
+            self.lots[x][y] = item
+            self.setCellData(item)
     """
     method: writeToCSV
 
-    A helper method to save/visualize the state of the grid
+    A helper method to save/visualize the state of the grid.
+    The rows come straight off the type code grid through a code-to-label
+    table and go out through numpy's C-level writer, so no agent objects
+    are stringified one cell at a time.
 
     Argument:
-    filename     name for the output csv file   
+    filename     name for the output csv file
     """
     def writeToCSV(self,filename = 'testSchelling.csv'):
-        outputFile = open(filename,'wb')
-        csvWriter = csv.writer(outputFile)
-        csvWriter.writerows(self.lots)
-        outputFile.close()
+        #one label per interned code, with the empty marker in the last
+        #slot so EMPTY_CODE (-1) indexes it directly
+        labels = np.empty(len(self.typecodes) + 1,dtype=object)
+        labels[-1] = EMPTYLOT
+        for (mytype,low,high),code in self.typecodes.items():
+            labels[code] = mytype
+        np.savetxt(filename,labels[self.grid],fmt='%s',delimiter=',')
 
 
 
@@ -598,9 +1206,8 @@ def run(neighborhood,ticks=30,saveCSVs=False):
     history = []
     if saveCSVs:neighborhood.writeToCSV('SchellingBefore.csv')
     for tick in range(ticks):
-        stats = neighborhood.getStats()
+        stats = neighborhood.tick()
         history.append((tick,stats))
-        neighborhood.move()
         if stats[0] ==0.0: break
     if saveCSVs:neighborhood.writeToCSV('SchellingAfter.csv')
     return history
@@ -621,17 +1228,16 @@ def run(neighborhood,ticks=30,saveCSVs=False):
    Return:
    Neighborhood       An instantiated Schelling Neighborhood
 """
-def likesSameAgeNeighborhood(size,preference=0.3,populatedpercent=.95,averageage=45,minage=20,maxage=90):
-    neighborhood = Neighborhood(size)
-    for x in range(size):
-        for y in range(size):
-            #decide if the lot will be populated
-            pick = uniform(0,1)
-            if pick < populatedpercent:
-                #produce a random age between minage and maxage
-                age = floor(triangular(minage,maxage,averageage))
-                age = int(age)
-                agent= ContinuousLikesSameAgent(neighborhood,age,age-5,age+5,preference,(x,y))
+def likesSameAgeNeighborhood(size,preference=0.3,populatedpercent=.95,averageage=45,minage=20,maxage=90,rng=None):
+    if rng is None: rng = np.random.default_rng()
+    neighborhood = Neighborhood(size,rng=rng)
+    #decide every lot and age in two batched draws instead of
+    #calling the random module once per cell
+    populated = rng.random((size,size)) < populatedpercent
+    ages = np.floor(rng.triangular(minage,averageage,maxage,size=(size,size))).astype(int)
+    for x,y in np.argwhere(populated):
+        age = int(ages[x,y])
+        agent= ContinuousLikesSameAgent(neighborhood,age,age-5,age+5,preference,(int(x),int(y)))
     return neighborhood
 
 
@@ -651,19 +1257,16 @@ def likesSameAgeNeighborhood(size,preference=0.3,populatedpercent=.95,averageage
    Return:
    Neighborhood       An instantiated Schelling Neighborhood
 """
-def likesOtherAgeNeighborhood(size,preference=0.4,populatedpercent=.95,averageage=55,minage=20,maxage=95):
-    neighborhood = Neighborhood(size)
-    for x in range(size):
-        for y in range(size):
-            #decide if the lot will be populated
-            pick = uniform(0,1)
-            if pick < populatedpercent:
-                #produce a random age between minage and maxage
-                age = normalvariate(averageage,10)
-                if age < minage: age = minage
-                if age > maxage: age = maxage
-                age = int(age)
-                agent= ContinuousLikesOtherAgent(neighborhood,age,age-7,age+7,preference,(x,y))
+def likesOtherAgeNeighborhood(size,preference=0.4,populatedpercent=.95,averageage=55,minage=20,maxage=95,rng=None):
+    if rng is None: rng = np.random.default_rng()
+    neighborhood = Neighborhood(size,rng=rng)
+    #decide every lot and age in two batched draws instead of
+    #calling the random module once per cell
+    populated = rng.random((size,size)) < populatedpercent
+    ages = np.clip(rng.normal(averageage,10,size=(size,size)),minage,maxage).astype(int)
+    for x,y in np.argwhere(populated):
+        age = int(ages[x,y])
+        agent= ContinuousLikesOtherAgent(neighborhood,age,age-7,age+7,preference,(int(x),int(y)))
     return neighborhood
 
 """
@@ -682,18 +1285,18 @@ def likesOtherAgeNeighborhood(size,preference=0.4,populatedpercent=.95,averageag
   Return:
   Neighborhood     An instantiated Schelling Neighborhood
 """
-def likesSameNeighborhood(size,preference=0.3,typeA='X',typeB='O',typeASplit=0.5,typeBSplit=0.4):
-    if typeASplit + typeBSplit > 1.0: return 'Split values must add to 1.0.'     
-    neighborhood = Neighborhood(size)
-    for x in range(size):
-        for y in range(size):
-            pick = uniform(0,1)
-            #decide if the lot will be typeA
-            if pick <= typeASplit:
-                LikesSameAgent(neighborhood,typeA,preference,(x,y))
-            #decide if the lot will be typeB (anything leftover will be an EmptyLot)
-            elif pick <= typeASplit + typeBSplit:
-                LikesSameAgent(neighborhood,typeB,preference,(x,y))
+def likesSameNeighborhood(size,preference=0.3,typeA='X',typeB='O',typeASplit=0.5,typeBSplit=0.4,rng=None):
+    if typeASplit + typeBSplit > 1.0: return 'Split values must add to 1.0.'
+    if rng is None: rng = np.random.default_rng()
+    neighborhood = Neighborhood(size,rng=rng)
+    #one batched draw decides every lot; anything not typeA or typeB stays an EmptyLot
+    picks = rng.random((size,size))
+    typeAcells = picks <= typeASplit
+    typeBcells = (picks <= typeASplit + typeBSplit) & ~typeAcells
+    for x,y in np.argwhere(typeAcells):
+        LikesSameAgent(neighborhood,typeA,preference,(int(x),int(y)))
+    for x,y in np.argwhere(typeBcells):
+        LikesSameAgent(neighborhood,typeB,preference,(int(x),int(y)))
     return neighborhood
 
 """
@@ -712,18 +1315,18 @@ def likesSameNeighborhood(size,preference=0.3,typeA='X',typeB='O',typeASplit=0.5
   Return:
   Neighborhood     An instantiated Schelling Neighborhood
 """
-def likesOthersNeighborhood(size,preference=0.4,typeA='X',typeB='O',typeASplit=0.5,typeBSplit=0.4):
-    if typeASplit + typeBSplit > 1.0: return 'Split values must add to 1.0.'     
-    neighborhood = Neighborhood(size)
-    for x in range(size):
-        for y in range(size):
-            pick = uniform(0,1)
-            #decide if the lot will be typeA
-            if pick <= typeASplit:
-                LikesOthersAgent(neighborhood,typeA,preference,(x,y))
-            #decide if the lot will be typeB (anything leftover will be an EmptyLot)    
-            elif pick <= typeASplit + typeBSplit:
-                LikesOthersAgent(neighborhood,typeB,preference,(x,y))
+def likesOthersNeighborhood(size,preference=0.4,typeA='X',typeB='O',typeASplit=0.5,typeBSplit=0.4,rng=None):
+    if typeASplit + typeBSplit > 1.0: return 'Split values must add to 1.0.'
+    if rng is None: rng = np.random.default_rng()
+    neighborhood = Neighborhood(size,rng=rng)
+    #one batched draw decides every lot; anything not typeA or typeB stays an EmptyLot
+    picks = rng.random((size,size))
+    typeAcells = picks <= typeASplit
+    typeBcells = (picks <= typeASplit + typeBSplit) & ~typeAcells
+    for x,y in np.argwhere(typeAcells):
+        LikesOthersAgent(neighborhood,typeA,preference,(int(x),int(y)))
+    for x,y in np.argwhere(typeBcells):
+        LikesOthersAgent(neighborhood,typeB,preference,(int(x),int(y)))
     return neighborhood
 
 
@@ -735,187 +1338,5 @@ def likesOthersNeighborhood(size,preference=0.4,typeA='X',typeB='O',typeASplit=0
 def demo(neighborhoodfunction=likesSameNeighborhood):
     n = neighborhoodfunction(20)
     r = run(n,20,True)
-    print r
+    print(r)
     return r
-
-"""
-testagents
-
-Unit tests to keep the developer honest
-"""
-class testagents(unittest.TestCase):
-    def getsuite(self):
-        suite = unittest.TestSuite()  
-        suite.addTest(testagents('test_buildNeighborhood'))
-        suite.addTest(testagents('test_buildLikeSame'))   
-        suite.addTest(testagents('test_buildLikeOthers'))       
-        suite.addTest(testagents('test_percentAllSame'))    
-        suite.addTest(testagents('test_percentSomeSame'))
-        suite.addTest(testagents('test_smallMove'))
-        suite.addTest(testagents('test_smallMoveLikesOthers'))
-        suite.addTest(testagents('test_buildContinuousLikeSame'))
-        suite.addTest(testagents('test_buildContinuousLikeOthers'))
-        suite.addTest(testagents('test_continuouslikesameisunhappy'))
-        suite.addTest(testagents('test_continuouslikeotherisunhappy'))
-        suite.addTest(testagents('test_continuoussmallmove'))
-        suite.addTest(testagents('test_demo'))        
-
-        
-        return suite
-      
-    def runTest(self):
-        runner = unittest.TextTestRunner(verbosity=2)
-        suite = self.getsuite()
-        result = runner.run(suite)    
-        return result
-
-    def test_demo(self):
-
-        results = demo(likesSameNeighborhood)
-        self.assertTrue(len(results)>0)
-        results = demo(likesOthersNeighborhood)
-        self.assertTrue(len(results)>0)
-        results = demo(likesOtherAgeNeighborhood)
-        self.assertTrue(len(results)>0)
-        results = demo(likesSameAgeNeighborhood)
-        self.assertTrue(len(results)>0)
-    
-    def test_buildNeighborhood(self):       
-        n = Neighborhood(50)    
-        self.assertEqual(n.dimension,50)
-        self.assertEquals(len(n.lots),50)
-        for x in range(50):
-            self.assertEquals(len(n.lots[x]),50)
-        self.assertEqual(n.agents,[]) 
-        origin_neighbors = n.getNeighborhood(n.lots[0][0].x,n.lots[0][0].y,1)
-        self.assertEqual(len(origin_neighbors[0]),3)
-        self.assertEqual(len(origin_neighbors[1]),3)
-        self.assertEqual(len(origin_neighbors[2]),3)
-        self.assertEqual(origin_neighbors[0][0].x,49)
-        self.assertEqual(origin_neighbors[0][0].y,49)
-        
-    def test_buildLikeSame(self):
-        n=Neighborhood(10)
-        s=LikesSameAgent(n,'X',0.3)
-        self.assertEqual(s.mytype,'X')
-        self.assertEqual(s.preference,0.3)
-        self.assertEqual(s.isUnhappy(),False)
-        
-    def test_buildLikeOthers(self):
-        n=Neighborhood(10)
-        s=LikesOthersAgent(n,'X',0.3)
-        self.assertEqual(s.mytype,'X')
-        self.assertEqual(s.preference,0.3)
-        self.assertEqual(s.isUnhappy(),False)   
-        
-    def test_percentAllSame(self):
-        n=Neighborhood(10)
-        s=LikesSameAgent(n,'X',0.1,(0,1)) 
-        s1=LikesSameAgent(n,'X',0.1,(1,1))
-        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
-        self.assertEqual(s.percentSame(),1.0)
-
-    def test_percentSomeSame(self):
-        n=Neighborhood(10)
-        s=LikesSameAgent(n,'X',0.1,(0,1)) 
-        s1=LikesSameAgent(n,'X',0.1,(1,1))
-        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
-        s3=LikesSameAgent(n,'O',0.4,(0,2))
-        self.assertEqual(s.percentSame(),0.5)     
-  
-    def test_isUnhappy(self):
-        seed(1)
-        n=Neighborhood(10)
-        s=LikesSameAgent(n,'X',0.1,(0,1)) 
-        s1=LikesSameAgent(n,'X',0.1,(1,1))
-        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
-        s3=LikesSameAgent(n,'O',0.4,(0,2))  
-        self.assertEquals(s3.isUnhappy(),True)
-        
-    def test_smallMove(self):
-        seed(1)
-        n=Neighborhood(10)
-        s=LikesSameAgent(n,'X',0.1,(0,1)) 
-        s1=LikesSameAgent(n,'X',0.1,(1,1))
-        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
-        s3=LikesSameAgent(n,'O',0.4,(0,2))
-        before =  n.getStats()
-        self.assertEqual(before,(0.25,0.5))
-        self.assertEqual(len(n.agents),4)
-        n.move() 
-        after  =  n.getStats()
-        self.assertEqual(after,(0.0,1.0))
-        self.assertEqual(len(n.agents),4)
-
-    def test_smallMoveLikesOthers(self):
-        seed(1)
-        n=Neighborhood(10)
-        s=LikesOthersAgent(n,'X',0.1,(0,1)) 
-        s1=LikesSameAgent(n,'X',0.1,(1,1))
-        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
-        s3=LikesOthersAgent(n,'O',0.1,(2,2))
-        before =  n.getStats()
-        self.assertEqual(before,(0.25,0.5))
-        self.assertEqual(len(n.agents),4)
-        n.move() 
-        after  =  n.getStats()
-        self.assertEqual(len(n.agents),4)
-        self.assertEqual(after,(0.0,0.3333))
-  
-        
-    def test_buildContinuousLikeSame(self):
-        n=Neighborhood(10)
-        s=ContinuousLikesSameAgent(n,45,40,50,0.3,(0,1))
-        self.assertEqual(s.mytype,45)
-        self.assertEqual(s.minrange,40)
-        self.assertEqual(s.maxrange,50)
-        self.assertEqual(s.preference,0.3)
-        self.assertEqual(s.isUnhappy(),False)
-        self.assertEquals(s.x,0)
-        self.assertEquals(s.y,1)
-        i = s.info()
-        self.assertTrue(i.startswith('Continuous'))
-        
-    def test_buildContinuousLikeOthers(self):
-        n=Neighborhood(10)
-        s=ContinuousLikesOtherAgent(n,45,40,50,0.3)
-        self.assertEqual(s.mytype,45)
-        self.assertEqual(s.minrange,40)
-        self.assertEqual(s.maxrange,50)        
-        self.assertEqual(s.preference,0.3)
-        self.assertEqual(s.isUnhappy(),False)
-        i = s.info()
-        self.assertTrue(i.startswith('Continuous'))
-        
-    def test_continuouslikesameisunhappy(self):
-        seed(1)
-        n=Neighborhood(10)
-        s=ContinuousLikesSameAgent(n,45,40,50,0.1,(0,1)) 
-        s1=ContinuousLikesSameAgent(n,41,31,51,0.1,(1,1)) 
-        s3=ContinuousLikesSameAgent(n,22,20,30,0.4,(0,2)) 
-        self.assertEquals(s3.isUnhappy(),True)   
-        
-    def test_continuouslikeotherisunhappy(self):
-        seed(1)
-        n=Neighborhood(10)
-        s=ContinuousLikesSameAgent(n,45,40,50,0.1,(0,1)) 
-        s1=ContinuousLikesSameAgent(n,41,31,51,0.1,(1,1)) 
-        s3=ContinuousLikesOtherAgent(n,39,30,46,0.4,(0,2)) 
-        self.assertEquals(s3.isUnhappy(),True)
-        
-    def test_continuoussmallmove(self):
-        seed(1)
-        n=Neighborhood(10)
-        s=ContinuousLikesSameAgent(n,45,40,50,0.1,(0,1)) 
-        s1=ContinuousLikesSameAgent(n,41,31,51,0.1,(1,1))
-        s2=ContinuousLikesSameAgent(n,47,37,49,0.1,(2,1)) 
-        s3=ContinuousLikesSameAgent(n,22,20,30,0.4,(0,2))        
-        before =  n.getStats()
-        self.assertEqual(before,(0.25,0.5))
-        self.assertEqual(len(n.agents),4)
-        n.move() 
-        after  =  n.getStats()
-        self.assertEqual(after,(0.0,1.0))
-        self.assertEqual(len(n.agents),4)        
-       
-          
@@ -0,0 +1,56 @@
+"""
+bench_schelling
+
+Timing helpers for the Schelling model. Kept out of
+SchellingSegregationModel so simulation imports never pay for timeit.
+
+Usage:
+    python bench_schelling.py
+"""
+
+import timeit
+
+from SchellingSegregationModel import likesSameNeighborhood,run
+
+"""
+Function: benchRun
+
+Time full simulation runs for one grid size.
+
+Arguments:
+dimension    width/height of the square neighborhood
+cycles       time ticks per run
+repeats      number of timed runs; the fastest is reported
+
+Return:
+float        best wall time in seconds for one run
+"""
+def benchRun(dimension,cycles = 20,repeats = 3):
+    def once():
+        neighborhood = likesSameNeighborhood(dimension)
+        run(neighborhood,cycles)
+    return min(timeit.repeat(once,number=1,repeat=repeats))
+
+"""
+Function: benchScan
+
+Time the full-neighborhood scan on its own for one grid size.
+
+Arguments:
+dimension    width/height of the square neighborhood
+repeats      number of timed scans; the fastest is reported
+
+Return:
+float        best wall time in seconds for one scan
+"""
+def benchScan(dimension,repeats = 5):
+    neighborhood = likesSameNeighborhood(dimension)
+    neighborhood.scanNeighborhood()   #warm up the compiled kernel
+    def once():
+        neighborhood._scancache = None
+        neighborhood.scanNeighborhood()
+    return min(timeit.repeat(once,number=1,repeat=repeats))
+
+if __name__ == '__main__':
+    for dimension in (20,50,100,200):
+        print('%4d  scan %8.5fs  run %8.3fs' % (dimension,benchScan(dimension),benchRun(dimension)))
@@ -0,0 +1,236 @@
+"""
+test_schelling
+
+Unit tests to keep the developer honest. They live in their own module so
+that importing SchellingSegregationModel pulls in none of the unittest
+machinery - the model module stays lean for simulation runs.
+
+Run with either:
+    python -m unittest test_schelling
+    python -m pytest test_schelling.py
+"""
+
+import unittest
+from random import seed
+
+import SchellingSegregationModel
+from SchellingSegregationModel import (EMPTY_CODE,Neighborhood,LikesSameAgent,LikesOthersAgent,
+                                       ContinuousLikesSameAgent,ContinuousLikesOtherAgent,
+                                       likesSameNeighborhood,likesOthersNeighborhood,
+                                       likesSameAgeNeighborhood,likesOtherAgeNeighborhood,
+                                       demo)
+
+class TestAgents(unittest.TestCase):
+    def getsuite(self):
+        suite = unittest.TestSuite()  
+        suite.addTest(TestAgents('test_buildNeighborhood'))
+        suite.addTest(TestAgents('test_buildLikeSame'))   
+        suite.addTest(TestAgents('test_buildLikeOthers'))       
+        suite.addTest(TestAgents('test_percentAllSame'))    
+        suite.addTest(TestAgents('test_percentSomeSame'))
+        suite.addTest(TestAgents('test_smallMove'))
+        suite.addTest(TestAgents('test_smallMoveLikesOthers'))
+        suite.addTest(TestAgents('test_buildContinuousLikeSame'))
+        suite.addTest(TestAgents('test_buildContinuousLikeOthers'))
+        suite.addTest(TestAgents('test_continuouslikesameisunhappy'))
+        suite.addTest(TestAgents('test_continuouslikeotherisunhappy'))
+        suite.addTest(TestAgents('test_continuoussmallmove'))
+        suite.addTest(TestAgents('test_numpyfallbackscan'))
+        suite.addTest(TestAgents('test_demo'))
+
+        
+        return suite
+      
+    def runTest(self):
+        runner = unittest.TextTestRunner(verbosity=2)
+        suite = self.getsuite()
+        result = runner.run(suite)    
+        return result
+
+    def test_demo(self):
+
+        results = demo(likesSameNeighborhood)
+        self.assertTrue(len(results)>0)
+        results = demo(likesOthersNeighborhood)
+        self.assertTrue(len(results)>0)
+        results = demo(likesOtherAgeNeighborhood)
+        self.assertTrue(len(results)>0)
+        results = demo(likesSameAgeNeighborhood)
+        self.assertTrue(len(results)>0)
+    
+    def test_buildNeighborhood(self):
+        n = Neighborhood(50)
+        self.assertEqual(n.dimension,50)
+        self.assertEquals(len(n.lots),50)
+        for x in range(50):
+            self.assertEquals(len(n.lots[x]),50)
+        self.assertEqual(n.agents,[])
+        #empty lots hold no objects - just None and the EMPTY_CODE sentinel
+        self.assertIsNone(n.lots[0][0])
+        self.assertEqual(n.grid[0][0],EMPTY_CODE)
+        origin_neighbors = n.getNeighborhood(0,0,1)
+        self.assertEqual(len(origin_neighbors[0]),3)
+        self.assertEqual(len(origin_neighbors[1]),3)
+        self.assertEqual(len(origin_neighbors[2]),3)
+        #the window wraps around the torus - an agent at (49,49) shows up
+        #in the corner of the origin's neighborhood
+        corner = LikesSameAgent(n,'X',0.3,(49,49))
+        origin_neighbors = n.getNeighborhood(0,0,1)
+        self.assertIs(origin_neighbors[0][0],corner)
+        
+    def test_buildLikeSame(self):
+        n=Neighborhood(10)
+        s=LikesSameAgent(n,'X',0.3)
+        self.assertEqual(s.mytype,'X')
+        self.assertEqual(s.preference,0.3)
+        self.assertEqual(s.isUnhappy(),False)
+        
+    def test_buildLikeOthers(self):
+        n=Neighborhood(10)
+        s=LikesOthersAgent(n,'X',0.3)
+        self.assertEqual(s.mytype,'X')
+        self.assertEqual(s.preference,0.3)
+        self.assertEqual(s.isUnhappy(),False)   
+        
+    def test_percentAllSame(self):
+        n=Neighborhood(10)
+        s=LikesSameAgent(n,'X',0.1,(0,1)) 
+        s1=LikesSameAgent(n,'X',0.1,(1,1))
+        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
+        self.assertEqual(s.percentSame(),1.0)
+
+    def test_percentSomeSame(self):
+        n=Neighborhood(10)
+        s=LikesSameAgent(n,'X',0.1,(0,1)) 
+        s1=LikesSameAgent(n,'X',0.1,(1,1))
+        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
+        s3=LikesSameAgent(n,'O',0.4,(0,2))
+        self.assertEqual(s.percentSame(),0.5)     
+  
+    def test_isUnhappy(self):
+        seed(1)
+        n=Neighborhood(10)
+        s=LikesSameAgent(n,'X',0.1,(0,1)) 
+        s1=LikesSameAgent(n,'X',0.1,(1,1))
+        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
+        s3=LikesSameAgent(n,'O',0.4,(0,2))  
+        self.assertEquals(s3.isUnhappy(),True)
+        
+    def test_smallMove(self):
+        seed(1)
+        n=Neighborhood(10)
+        s=LikesSameAgent(n,'X',0.1,(0,1)) 
+        s1=LikesSameAgent(n,'X',0.1,(1,1))
+        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
+        s3=LikesSameAgent(n,'O',0.4,(0,2))
+        before =  n.getStats()
+        self.assertEqual(before,(0.25,0.5))
+        self.assertEqual(len(n.agents),4)
+        n.move() 
+        after  =  n.getStats()
+        self.assertEqual(after,(0.0,1.0))
+        self.assertEqual(len(n.agents),4)
+
+    def test_smallMoveLikesOthers(self):
+        seed(1)
+        n=Neighborhood(10)
+        s=LikesOthersAgent(n,'X',0.1,(0,1)) 
+        s1=LikesSameAgent(n,'X',0.1,(1,1))
+        s2=LikesSameAgent(n,'X',0.1,(2,1)) 
+        s3=LikesOthersAgent(n,'O',0.1,(2,2))
+        before =  n.getStats()
+        self.assertEqual(before,(0.25,0.5))
+        self.assertEqual(len(n.agents),4)
+        n.move() 
+        after  =  n.getStats()
+        self.assertEqual(len(n.agents),4)
+        self.assertEqual(after,(0.0,0.3333))
+  
+        
+    def test_buildContinuousLikeSame(self):
+        n=Neighborhood(10)
+        s=ContinuousLikesSameAgent(n,45,40,50,0.3,(0,1))
+        self.assertEqual(s.mytype,45)
+        self.assertEqual(s.minrange,40)
+        self.assertEqual(s.maxrange,50)
+        self.assertEqual(s.preference,0.3)
+        self.assertEqual(s.isUnhappy(),False)
+        self.assertEquals(s.x,0)
+        self.assertEquals(s.y,1)
+        i = s.info()
+        self.assertTrue(i.startswith('Continuous'))
+        
+    def test_buildContinuousLikeOthers(self):
+        n=Neighborhood(10)
+        s=ContinuousLikesOtherAgent(n,45,40,50,0.3)
+        self.assertEqual(s.mytype,45)
+        self.assertEqual(s.minrange,40)
+        self.assertEqual(s.maxrange,50)        
+        self.assertEqual(s.preference,0.3)
+        self.assertEqual(s.isUnhappy(),False)
+        i = s.info()
+        self.assertTrue(i.startswith('Continuous'))
+        
+    def test_continuouslikesameisunhappy(self):
+        seed(1)
+        n=Neighborhood(10)
+        s=ContinuousLikesSameAgent(n,45,40,50,0.1,(0,1)) 
+        s1=ContinuousLikesSameAgent(n,41,31,51,0.1,(1,1)) 
+        s3=ContinuousLikesSameAgent(n,22,20,30,0.4,(0,2)) 
+        self.assertEquals(s3.isUnhappy(),True)   
+        
+    def test_continuouslikeotherisunhappy(self):
+        seed(1)
+        n=Neighborhood(10)
+        s=ContinuousLikesSameAgent(n,45,40,50,0.1,(0,1)) 
+        s1=ContinuousLikesSameAgent(n,41,31,51,0.1,(1,1)) 
+        s3=ContinuousLikesOtherAgent(n,39,30,46,0.4,(0,2)) 
+        self.assertEquals(s3.isUnhappy(),True)
+        
+    def test_continuoussmallmove(self):
+        seed(1)
+        n=Neighborhood(10)
+        s=ContinuousLikesSameAgent(n,45,40,50,0.1,(0,1)) 
+        s1=ContinuousLikesSameAgent(n,41,31,51,0.1,(1,1))
+        s2=ContinuousLikesSameAgent(n,47,37,49,0.1,(2,1)) 
+        s3=ContinuousLikesSameAgent(n,22,20,30,0.4,(0,2))        
+        before =  n.getStats()
+        self.assertEqual(before,(0.25,0.5))
+        self.assertEqual(len(n.agents),4)
+        n.move()
+        after  =  n.getStats()
+        self.assertEqual(after,(0.0,1.0))
+        self.assertEqual(len(n.agents),4)
+
+    def test_numpyfallbackscan(self):
+        #the numpy rolling-window scan only runs when numba is absent, so
+        #force it via the module flag and check it agrees with whatever path
+        #ran first plus the scalar isUnhappy.  The grid mixes radius 1
+        #(popcount branch) with radius 2 (summed-area branch).
+        n=Neighborhood(12)
+        LikesSameAgent(n,'X',0.4,(0,1))
+        LikesSameAgent(n,'X',0.4,(1,1))
+        LikesSameAgent(n,'X',0.4,(2,1))
+        LikesSameAgent(n,'X',0.4,(5,5))
+        LikesSameAgent(n,'X',0.4,(11,0))
+        LikesOthersAgent(n,'O',0.3,(0,2))
+        LikesOthersAgent(n,'O',0.3,(2,2))
+        LikesOthersAgent(n,'O',0.3,(6,5))
+        ContinuousLikesSameAgent(n,45,40,50,0.4,(8,8),2)
+        ContinuousLikesSameAgent(n,46,41,51,0.4,(8,9),2)
+        ContinuousLikesSameAgent(n,22,20,30,0.4,(9,8),2)
+        same,total,unhappy = n.scanNeighborhood()
+        sums = n.scansums
+        saved = SchellingSegregationModel.NUMBA_AVAILABLE
+        try:
+            SchellingSegregationModel.NUMBA_AVAILABLE = False
+            n._scancache = None
+            fsame,ftotal,funhappy = n.scanNeighborhood()
+            self.assertEqual(fsame.tolist(),same.tolist())
+            self.assertEqual(ftotal.tolist(),total.tolist())
+            self.assertEqual(funhappy.tolist(),unhappy.tolist())
+            self.assertEqual(n.scansums,sums)
+            for agent in n.agents:
+                self.assertEqual(bool(funhappy[agent.x][agent.y]),agent.isUnhappy())
+        finally:
+            SchellingSegregationModel.NUMBA_AVAILABLE = saved